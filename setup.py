@@ -45,5 +45,6 @@ setup(name='PyReshaper',
       ],
       python_requires='>=2.7,<3.0',
       scripts=['scripts/s2smake', 'scripts/s2srun'],
-      install_requires=['mpi4py', 'asaptools']
+      install_requires=['mpi4py', 'asaptools'],
+      extras_require={'scandir': ['scandir']}
       )
@@ -21,6 +21,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from cPickle import HIGHEST_PROTOCOL, dumps
 from os import O_CREAT, O_RDONLY
 from os import close as fdclose
 from os import fstatvfs, linesep
@@ -30,7 +31,7 @@ from os.path import exists, isdir, isfile, join
 # For memory diagnostics
 from resource import RUSAGE_SELF, getrusage
 # Built-in imports
-from sys import platform
+from sys import exc_info, platform
 
 # Third-party imports
 import numpy
@@ -275,10 +276,30 @@ class Reshaper(object):
             self._vprint('  MPI Communicator Size: {}'.format(
                 self._simplecomm.get_size()), verbosity=1)
 
-        # Validate the user input data
+        # Validate the user input data on the manager rank only (so that the
+        # input files are not checked once per rank) and send the validated
+        # specifier, or the validation error, to all ranks.  Any error is
+        # caught and sent, so that the other ranks never wait forever.
         self._timer.start('Specifier Validation')
-        specifier.validate()
+        validation_error = None
+        validation_exc_info = None
+        if self._simplecomm.is_manager():
+            try:
+                specifier.validate(io=True)
+            except Exception as err:
+                validation_exc_info = exc_info()
+                try:
+                    dumps(err, HIGHEST_PROTOCOL)
+                    validation_error = err
+                except Exception:
+                    validation_error = RuntimeError(str(err))
+        specifier, validation_error = self._simplecomm.partition(
+            (specifier, validation_error), func=Duplicate(), involved=True)
         self._timer.stop('Specifier Validation')
+        if validation_exc_info is not None:
+            raise validation_exc_info[0], validation_exc_info[1], validation_exc_info[2]
+        if validation_error is not None:
+            raise validation_error
         if self._simplecomm.is_manager():
             self._vprint('  Specifier validated', verbosity=1)
 
@@ -23,23 +23,229 @@ limitations under the License.
 
 # Built-in imports
 import cPickle as pickle
+import os
+from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 from os import path as ospath
 
+try:
+    _scandir_ = os.scandir
+except AttributeError:
+    try:
+        _scandir_ = __import__('scandir').scandir
+    except ImportError:
+        _scandir_ = None
+
+# Number of files below which per-file checks are done serially
+_MIN_PARALLEL_STATS_ = 16
+
+# Maximum number of threads used for per-file checks
+_MAX_STAT_THREADS_ = 32
+
+# Directories already found to exist (shared by all Specifier instances)
+_ISDIR_CACHE_ = set()
+
+# Maximum number of directories remembered in the directory cache
+_ISDIR_CACHE_SIZE_ = 256
+
+
+#=========================================================================
+# _intern_str
+#=========================================================================
+def _intern_str(value):
+    """
+    Intern a short tag string, so that comparisons with literals are fast
+
+    Values that are not plain strings are returned unchanged, so that they
+    can still be rejected by Specifier.validate_types().
+
+    Parameters:
+        value: The value to intern
+
+    Returns:
+        The interned string, or the value unchanged if it is not a str
+    """
+    if type(value) is str:
+        return intern(value)
+    return value
+
+
+#=========================================================================
+# _isdir_cached
+#=========================================================================
+def _isdir_cached(dir_name):
+    """
+    Check whether a directory exists, remembering directories that do
+
+    Only directories that are found to exist are remembered, so a directory
+    that is created later is still found.  A remembered directory that is
+    later removed is still reported as existing until the cache is cleared.
+    This is not an LRU cache: the whole cache is emptied when it reaches its
+    maximum size, or by calling _clear_isdir_cache().
+
+    Parameters:
+        dir_name (str): Absolute name of the directory to check
+
+    Returns:
+        bool: True if the directory exists, False otherwise
+    """
+    if dir_name in _ISDIR_CACHE_:
+        return True
+    if not ospath.isdir(dir_name):
+        return False
+    if len(_ISDIR_CACHE_) >= _ISDIR_CACHE_SIZE_:
+        _ISDIR_CACHE_.clear()
+    _ISDIR_CACHE_.add(dir_name)
+    return True
+
+
+#=========================================================================
+# _clear_isdir_cache
+#=========================================================================
+def _clear_isdir_cache():
+    """
+    Forget all directories remembered by _isdir_cached()
+    """
+    _ISDIR_CACHE_.clear()
+
+
+#=========================================================================
+# _scan_regular_files
+#=========================================================================
+def _scan_regular_files(dir_name, base_names):
+    """
+    Scan a directory once to find which of the given names are regular files
+
+    Only the entries named in base_names are checked with is_file(), since
+    that can require a stat (e.g., for symlinks, or on filesystems that do
+    not report the entry type when listing a directory).
+
+    Parameters:
+        dir_name (str): Name of the directory to scan
+        base_names (list): Names of the entries in the directory to check
+
+    Returns:
+        dict: Dictionary of the given names, with True for each regular file,
+            or None if no scandir function is available or the directory
+            cannot be listed (e.g., it is execute-only)
+    """
+    if _scandir_ is None:
+        return None
+    wanted_names = set(base_names)
+    try:
+        entries = dict((entry.name, entry) for entry in _scandir_(dir_name)
+                       if entry.name in wanted_names)
+    except OSError:
+        return None
+    return dict((name, name in entries and entries[name].is_file())
+                for name in wanted_names)
+
+
+#=========================================================================
+# _isfile_all
+#=========================================================================
+def _isfile_all(file_names):
+    """
+    Check whether each of a list of filenames is a regular file
+
+    The checks are issued concurrently from a pool of threads, so that the
+    latency of each stat on a networked or parallel filesystem overlaps with
+    the others.  Short lists are checked serially.
+
+    Parameters:
+        file_names (list): List of filenames to check
+
+    Returns:
+        list: List of bools, True for each filename that is a regular file
+    """
+    if len(file_names) < _MIN_PARALLEL_STATS_:
+        return [ospath.isfile(file_name) for file_name in file_names]
+    pool = ThreadPool(min(_MAX_STAT_THREADS_, len(file_names)))
+    try:
+        return pool.map(ospath.isfile, file_names)
+    finally:
+        pool.close()
+        pool.join()
+
+
+#=========================================================================
+# _find_nonregular_file
+#=========================================================================
+def _find_nonregular_file(file_names):
+    """
+    Find the first name in a list of filenames that is not a regular file
+
+    Filenames are grouped by directory so that each directory is scanned only
+    once, rather than stat-ing each file individually.  Files in directories
+    that cannot be scanned are checked with _isfile_all().
+
+    Parameters:
+        file_names (list): List of filenames to check
+
+    Returns:
+        str: The first filename that is not a regular file, or None if all
+            filenames refer to regular files
+    """
+    dir_groups = defaultdict(list)
+    for file_name in file_names:
+        dir_groups[ospath.dirname(file_name) or '.'].append(file_name)
+
+    is_regular = {}
+    unchecked = []
+    for dir_name, dir_file_names in dir_groups.iteritems():
+        regular_files = _scan_regular_files(
+            dir_name, [ospath.basename(file_name) for file_name in dir_file_names])
+        if regular_files is None:
+            unchecked.extend(dir_file_names)
+            continue
+        for file_name in dir_file_names:
+            is_regular[file_name] = regular_files[ospath.basename(file_name)]
+    is_regular.update(zip(unchecked, _isfile_all(unchecked)))
+
+    for file_name in file_names:
+        if not is_regular[file_name]:
+            return file_name
+    return None
+
+
+# Specifier classes that can be created by name with create_specifier
+_SPECIFIER_REGISTRY_ = {}
+
+
+#=========================================================================
+# register_specifier
+#=========================================================================
+def register_specifier(name, cls):
+    """
+    Register a Specifier class so that it can be created by name
+
+    Parameters:
+        name (str): Name of the specifier type (as passed to create_specifier)
+        cls (type): Specifier class to create for the named type
+    """
+    _SPECIFIER_REGISTRY_[name] = cls
+
 
 #=========================================================================
 # create_specifier
 #=========================================================================
-def create_specifier(**kwargs):
+def create_specifier(spec_type='slice-to-series', **kwargs):
     """
     Factory function for Specifier class objects.  Defined for convenience.
 
     Parameters:
+        spec_type (str): Name of the type of Specifier to create, as given to
+            register_specifier
         kwargs (dict): Optional arguments to be passed to the newly created Specifier object's constructor.
 
     Returns:
         Specifier: An instantiation of the type of Specifier class desired.
     """
-    return Specifier(**kwargs)
+    cls = _SPECIFIER_REGISTRY_.get(spec_type)
+    if cls is None:
+        err_msg = "Specifier type {} is not a valid type".format(spec_type)
+        raise ValueError(err_msg)
+    return cls(**kwargs)
 
 
 #=========================================================================
@@ -54,18 +260,35 @@ class Specifier(object):
     by the Reshaper to perform the time-slice to time-series operation.
     """
 
+    # Fixed set of instance attributes (no per-instance __dict__)
+    __slots__ = ('input_file_list', 'netcdf_format', 'compression_level',
+                 'least_significant_digit', 'output_file_prefix',
+                 'output_file_suffix', 'time_series', 'time_variant_metadata',
+                 'assume_1d_time_variant_metadata', 'io_backend',
+                 'exclude_list', 'metadata_filename', 'options',
+                 '_abs_output_prefix', '_validated')
+
+    # Valid NetCDF output file formats
+    _VALID_FORMATS = frozenset(('netcdf', 'netcdf4', 'netcdf4c'))
+
+    # Required suffix of all output files
+    _NC_SUFFIX = '.nc'
+
+    # Slots holding cached values that are not pickled
+    _CACHE_SLOTS = frozenset(('_abs_output_prefix', '_validated'))
+
     def __init__(self,
-                 infiles=[],
+                 infiles=None,
                  ncfmt='netcdf4',
                  compression=0,
                  least_significant_digit=None,
                  prefix='tseries.',
                  suffix='.nc',
                  timeseries=None,
-                 metadata=[],
+                 metadata=None,
                  meta1d=False,
                  backend='netCDF4',
-                 exclude_list=[],
+                 exclude_list=None,
                  metafile=None,
                  **kwargs):
         """
@@ -98,10 +321,10 @@ class Specifier(object):
         """
 
         # The list of input (time-slice) NetCDF files (absolute paths)
-        self.input_file_list = infiles
+        self.input_file_list = [] if infiles is None else infiles
 
         # The string specifying the NetCDF file format for output
-        self.netcdf_format = ncfmt
+        self.netcdf_format = _intern_str(ncfmt)
 
         # The string specifying the NetCDF file format for output
         self.compression_level = compression
@@ -123,16 +346,16 @@ class Specifier(object):
 
         # List of time-variant variables that should be included in all output
         # files.
-        self.time_variant_metadata = metadata
+        self.time_variant_metadata = [] if metadata is None else metadata
 
         # Whether all 1D time-variant variables should be treated as metadata
         self.assume_1d_time_variant_metadata = meta1d
 
         # Store the netCDF I/O backend name
-        self.io_backend = backend
+        self.io_backend = _intern_str(backend)
 
         # time invariant variables to exclude from each timeseries file
-        self.exclude_list = exclude_list
+        self.exclude_list = [] if exclude_list is None else exclude_list
 
         # Name of file from which to search for metadata
         self.metadata_filename = metafile
@@ -140,16 +363,105 @@ class Specifier(object):
         # Optional arguments associated with the reshaper operation
         self.options = kwargs
 
-    def validate(self):
+        # Absolute output file prefix computed by the last validation
+        self._abs_output_prefix = None
+
+        # Result of the last successful validation (see validate())
+        self._validated = None
+
+    def __getstate__(self):
+        """
+        Return the instance state as a dictionary (for pickling)
+
+        The state includes the slots of every class in the MRO (so that the
+        state of subclasses is kept), plus the instance __dict__, if there is
+        one.  Slots that only hold cached values are not included.
+        """
+        state = {}
+        for cls in type(self).__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            if isinstance(slots, basestring):
+                slots = (slots,)
+            for name in slots:
+                if (name not in ('__dict__', '__weakref__') and
+                        name not in Specifier._CACHE_SLOTS and
+                        hasattr(self, name)):
+                    state[name] = getattr(self, name)
+        state.update(getattr(self, '__dict__', {}))
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore the instance state from a dictionary (for unpickling)
+
+        Parameters:
+            state (dict): Dictionary of attribute names and values
+        """
+        self._abs_output_prefix = None
+        self._validated = None
+        for name, value in state.iteritems():
+            if name in ('netcdf_format', 'io_backend'):
+                value = _intern_str(value)
+            setattr(self, name, value)
+
+    @classmethod
+    def invalidate_cache(cls):
+        """
+        Clear the stored results of previous output directory checks
+        """
+        _clear_isdir_cache()
+
+    def validate(self, io=False):
         """
         Perform self-validation of internal data
+
+        By default, only checks that need no filesystem access are performed.
+        Checking that the input files and output directory exist is opt-in.
+
+        If none of the validated data has changed since the last successful
+        call, the checks are skipped (unless the last call did not check the
+        filesystem and this one does).
+
+        Parameters:
+            io (bool): True if the input files and output directory should
+                also be checked on the filesystem, False otherwise
         """
 
+        # Skip validation if nothing has changed
+        state = self._validation_state()
+        if self._validated is not None:
+            validated_io, validated_state = self._validated
+            if (validated_io or not io) and validated_state == state:
+                return
+        self._validated = None
+
         # Validate types
         self.validate_types()
 
         # Validate values
-        self.validate_values()
+        if io:
+            self.validate_values()
+        else:
+            self._validate_values_pure()
+
+        # Validation may correct some values, so save the corrected state
+        self._validated = (io, self._validation_state())
+
+    def _validation_state(self):
+        """
+        Return a snapshot of the data checked by validate()
+
+        Lists are copied into tuples, so that changes made to them in place
+        are also detected.
+        """
+        return tuple(tuple(value) if isinstance(value, list) else value
+                     for value in (self.input_file_list, self.netcdf_format,
+                                   self.compression_level,
+                                   self.output_file_prefix,
+                                   self.output_file_suffix, self.time_series,
+                                   self.time_variant_metadata,
+                                   self.assume_1d_time_variant_metadata,
+                                   self.io_backend))
 
     def validate_types(self):
         """
@@ -164,10 +476,10 @@ class Specifier(object):
             raise TypeError(err_msg)
 
         # Validate that each input file name is a string
-        for ifile_name in self.input_file_list:
-            if not isinstance(ifile_name, basestring):
-                err_msg = "Input file names must be given as strings"
-                raise TypeError(err_msg)
+        if not all(isinstance(ifile_name, basestring)
+                   for ifile_name in self.input_file_list):
+            err_msg = "Input file names must be given as strings"
+            raise TypeError(err_msg)
 
         # Validate the netcdf format string
         if not isinstance(self.netcdf_format, basestring):
@@ -194,10 +506,10 @@ class Specifier(object):
             if not isinstance(self.time_series, list):
                 err_msg = "Time-series variables must be a list or None"
                 raise TypeError(err_msg)
-            for var_name in self.time_series:
-                if not isinstance(var_name, basestring):
-                    err_msg = "Time-series variable names must be given as strings"
-                    raise TypeError(err_msg)
+            if not all(isinstance(var_name, basestring)
+                       for var_name in self.time_series):
+                err_msg = "Time-series variable names must be given as strings"
+                raise TypeError(err_msg)
 
         # Validate the type of the time-variant metadata list
         if not isinstance(self.time_variant_metadata, list):
@@ -205,10 +517,10 @@ class Specifier(object):
             raise TypeError(err_msg)
 
         # Validate the type of each time-variant metadata variable name
-        for var_name in self.time_variant_metadata:
-            if not isinstance(var_name, basestring):
-                err_msg = "Time-variant metadata variable names must be given as strings"
-                raise TypeError(err_msg)
+        if not all(isinstance(var_name, basestring)
+                   for var_name in self.time_variant_metadata):
+            err_msg = "Time-variant metadata variable names must be given as strings"
+            raise TypeError(err_msg)
 
         # Validate the type of assume_1d_time_variant_metadata
         if not isinstance(self.assume_1d_time_variant_metadata, bool):
@@ -224,7 +536,9 @@ class Specifier(object):
         """
         Method to validate the values of the Specifier data.
 
-        This method is called by the validate() method.
+        This method is called by the validate() method when I/O checks are
+        requested.  It performs all of the checks of _validate_values_pure()
+        followed by those of _validate_values_io().
 
         We impose the (somewhat arbitrary) rule that the Specifier
         should not validate values what require "cracking" open the
@@ -232,6 +546,15 @@ class Specifier(object):
         be checked without any NetCDF file I/O (including reading the
         header information).
 
+        This method will correct some input if it is safe to do so.
+        """
+        self._validate_values_pure()
+        self._validate_values_io()
+
+    def _validate_values_pure(self):
+        """
+        Validate the values of the Specifier data that need no filesystem access
+
         This method will correct some input if it is safe to do so.
         """
 
@@ -240,20 +563,17 @@ class Specifier(object):
             err_msg = "There must be at least one input file given."
             raise ValueError(err_msg)
 
-        # Validate that each input file exists and is a regular file
-        for ifile_name in self.input_file_list:
-            if not ospath.isfile(ifile_name):
-                err_msg = "Input file {} is not a regular file".format(
-                    ifile_name)
-                raise ValueError(err_msg)
-
         # Validate the value of the netcdf format string
-        valid_formats = ['netcdf', 'netcdf4', 'netcdf4c']
-        if self.netcdf_format not in valid_formats:
+        if self.netcdf_format not in Specifier._VALID_FORMATS:
             err_msg = "Output NetCDF file format {} is not valid".format(
                 self.netcdf_format)
             raise ValueError(err_msg)
 
+        # Intern the format and backend tags (which may have been assigned
+        # after construction)
+        self.netcdf_format = _intern_str(self.netcdf_format)
+        self.io_backend = _intern_str(self.io_backend)
+
         # Forcefully set the compression level if 'netcdf4c' format
         if self.netcdf_format == 'netcdf4c':
             self.compression_level = 1
@@ -264,20 +584,49 @@ class Specifier(object):
                 self.compression_level)
             raise ValueError(err_msg)
 
-        # Validate the output file directory
-        abs_output_prefix = ospath.abspath(self.output_file_prefix)
+        # Validate the output file suffix string (should end in .nc)
+        if not self.output_file_suffix.endswith(Specifier._NC_SUFFIX):
+            self.output_file_suffix += Specifier._NC_SUFFIX
+
+        # Backend validated when PyReshaper is run ONLY!
+
+    def _validate_values_io(self):
+        """
+        Validate the values of the Specifier data that need filesystem access
+
+        This checks that each input file is a regular file and that the output
+        directory exists, and it converts the output file prefix to an
+        absolute path.
+        """
+
+        # Validate that each input file exists and is a regular file (each
+        # repeated file name is only checked once, but the input file list
+        # itself is left unchanged)
+        seen_file_names = set()
+        unique_file_names = []
+        for ifile_name in self.input_file_list:
+            if ifile_name not in seen_file_names:
+                seen_file_names.add(ifile_name)
+                unique_file_names.append(ifile_name)
+        bad_file_name = _find_nonregular_file(unique_file_names)
+        if bad_file_name is not None:
+            err_msg = "Input file {} is not a regular file".format(
+                bad_file_name)
+            raise ValueError(err_msg)
+
+        # Validate the output file directory (the absolute prefix is reused
+        # if the prefix has not changed since the last validation)
+        if self.output_file_prefix == self._abs_output_prefix:
+            abs_output_prefix = self._abs_output_prefix
+        else:
+            abs_output_prefix = ospath.abspath(self.output_file_prefix)
         abs_output_dir = ospath.dirname(abs_output_prefix)
-        if not ospath.isdir(abs_output_dir):
+        if not _isdir_cached(abs_output_dir):
             err_msg = ("Output directory {} implied in output prefix {} is not "
                        "valid").format(abs_output_dir, self.output_file_prefix)
             raise ValueError(err_msg)
         self.output_file_prefix = abs_output_prefix
-
-        # Validate the output file suffix string (should end in .nc)
-        if self.output_file_suffix[-3:] != '.nc':
-            self.output_file_suffix += '.nc'
-
-        # Backend validated when PyReshaper is run ONLY!
+        self._abs_output_prefix = abs_output_prefix
 
     def write(self, fname):
         """
@@ -295,6 +644,9 @@ class Specifier(object):
             raise OSError(err_msg)
 
 
+register_specifier('slice-to-series', Specifier)
+
+
 #==============================================================================
 # Command-line Operation
 #==============================================================================
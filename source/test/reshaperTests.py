@@ -23,6 +23,22 @@ import makeTestData
 MPI_COMM_WORLD = MPI.COMM_WORLD  # @UndefinedVariable
 
 
+#=========================================================================
+# _FailingSpecifier
+#=========================================================================
+class _FailingSpecifier(Specifier):
+
+    """
+    Specifier whose validation fails with an error other than TypeError or
+    ValueError
+    """
+
+    __slots__ = ()
+
+    def validate(self, io=False):
+        raise RuntimeError('Specifier validation failed')
+
+
 #=========================================================================
 # CommonTestsBase
 #=========================================================================
@@ -124,6 +140,21 @@ class CommonTestsBase(object):
                 self.check(tsvar)
         MPI_COMM_WORLD.Barrier()
 
+    def test_fail_validation(self):
+        self.spec_args['infiles'] = makeTestData.slices + ['missing.nc']
+        self.header()
+        spec = Specifier(**self.spec_args)
+        self.assertRaises(ValueError, create_reshaper,
+                          spec, **self.create_args)
+        MPI_COMM_WORLD.Barrier()
+
+    def test_fail_validation_other_error(self):
+        self.header()
+        spec = _FailingSpecifier(**self.spec_args)
+        self.assertRaises(RuntimeError, create_reshaper,
+                          spec, **self.create_args)
+        MPI_COMM_WORLD.Barrier()
+
     def test_I1(self):
         self.spec_args['infiles'] = makeTestData.slices[1:2]
         self.header()
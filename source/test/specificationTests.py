@@ -7,6 +7,8 @@ See the LICENSE.txt file for details
 
 import cPickle as pickle
 import os
+import shutil
+import tempfile
 import unittest
 
 from pyreshaper import specification
@@ -23,6 +25,31 @@ class SpecifierTests(unittest.TestCase):
     def setUp(self):
         self.cwd = os.path.dirname(os.path.realpath(__file__))
 
+    def tearDown(self):
+        specification.Specifier.invalidate_cache()
+
+    def test_create_specifier(self):
+        spec = specification.create_specifier(infiles=['a'])
+        self.assertIsInstance(spec, specification.Specifier,
+                              'Default specifier is not a Specifier')
+        self.assertEqual(spec.input_file_list, ['a'],
+                         'Arguments not passed to the Specifier')
+
+    def test_create_specifier_fail_type(self):
+        self.assertRaises(ValueError, specification.create_specifier,
+                          spec_type='series-to-slice')
+
+    def test_register_specifier(self):
+        class MySpecifier(specification.Specifier):
+            __slots__ = ()
+        specification.register_specifier('my-type', MySpecifier)
+        try:
+            spec = specification.create_specifier(spec_type='my-type')
+            self.assertIsInstance(spec, MySpecifier,
+                                  'Registered specifier type not created')
+        finally:
+            del specification._SPECIFIER_REGISTRY_['my-type']
+
     def test_init(self):
         spec = specification.Specifier()
         self.assertEqual(len(spec.input_file_list), 0,
@@ -96,6 +123,51 @@ class SpecifierTests(unittest.TestCase):
         self.assertEqual(spec.assume_1d_time_variant_metadata, meta1d,
                          '1D metadata flag not initialized properly')
 
+    def test_init_interned(self):
+        spec = specification.Specifier(ncfmt=''.join(['netcdf', '4c']),
+                                       backend=''.join(['N', 'io']))
+        self.assertIs(spec.netcdf_format, 'netcdf4c',
+                      'NetCDF format not interned')
+        self.assertIs(spec.io_backend, 'Nio',
+                      'I/O backend not interned')
+
+    def test_validate_interned(self):
+        spec = specification.Specifier(infiles=['a'])
+        spec.netcdf_format = ''.join(['netcdf', '4c'])
+        spec.io_backend = ''.join(['N', 'io'])
+        spec.validate()
+        self.assertIs(spec.netcdf_format, 'netcdf4c',
+                      'Assigned NetCDF format not interned by validate')
+        self.assertIs(spec.io_backend, 'Nio',
+                      'Assigned I/O backend not interned by validate')
+        spec.netcdf_format = ''.join(['netcdf', '4c'])
+        spec.io_backend = ''.join(['N', 'io'])
+        spec2 = pickle.loads(pickle.dumps(spec))
+        self.assertIs(spec2.netcdf_format, 'netcdf4c',
+                      'Unpickled NetCDF format not interned')
+        self.assertIs(spec2.io_backend, 'Nio',
+                      'Unpickled I/O backend not interned')
+
+    def test_init_fresh_lists(self):
+        spec1 = specification.Specifier()
+        spec1.input_file_list.append('a')
+        spec1.time_variant_metadata.append('x')
+        spec1.exclude_list.append('g')
+        spec2 = specification.Specifier()
+        self.assertEqual(spec2.input_file_list, [],
+                         'Input file list shared between instances')
+        self.assertEqual(spec2.time_variant_metadata, [],
+                         'Time variant metadata list shared between instances')
+        self.assertEqual(spec2.exclude_list, [],
+                         'Exclude list shared between instances')
+
+    def test_init_slots(self):
+        spec = specification.Specifier()
+        self.assertFalse(hasattr(spec, '__dict__'),
+                         'Specifier instance has a __dict__')
+        with self.assertRaises(AttributeError):
+            spec.not_an_attribute = 1
+
     def test_validate_types_defaults(self):
         in_list = ['a', 'b', 'c']
         spec = specification.Specifier(infiles=in_list)
@@ -238,6 +310,94 @@ class SpecifierTests(unittest.TestCase):
         spec.validate_types()
         self.assertRaises(ValueError, spec.validate_values)
 
+    def test_validate_values_fail_input_multidir(self):
+        in_list = [self.cwd + '/specificationTests.py',
+                   os.path.dirname(self.cwd) + '/setup.py',
+                   self.cwd + '/__init__.py']
+        spec = specification.Specifier(infiles=in_list)
+        spec.validate_types()
+        self.assertRaises(ValueError, spec.validate_values)
+
+    def test_validate_values_many_inputs(self):
+        tmpdir = tempfile.mkdtemp()
+        in_list = [os.path.join(tmpdir, 'slice{}.nc'.format(i))
+                   for i in xrange(40)]
+        for fname in in_list:
+            open(fname, 'w').close()
+        spec = specification.Specifier(infiles=in_list)
+        spec.validate_values()
+        spec = specification.Specifier(
+            infiles=in_list + [os.path.join(tmpdir, 'missing.nc')])
+        self.assertRaises(ValueError, spec.validate_values)
+        shutil.rmtree(tmpdir)
+
+    def test_validate_no_io(self):
+        in_list = ['a', 'b', 'c']
+        prefix = '/sfcsrytsdfv/pre.'
+        spec = specification.Specifier(infiles=in_list, prefix=prefix)
+        spec.validate()
+        self.assertEqual(spec.output_file_prefix, prefix,
+                         'Output file prefix changed without I/O validation')
+        self.assertRaises(ValueError, spec.validate, io=True)
+
+    def test_validate_values_prefix_change(self):
+        in_list = [self.cwd + '/specificationTests.py']
+        spec = specification.Specifier(infiles=in_list, prefix='pre.')
+        spec.validate_values()
+        self.assertEqual(spec.output_file_prefix, os.path.abspath('pre.'),
+                         'Output file prefix not made absolute')
+        spec.validate_values()
+        self.assertEqual(spec.output_file_prefix, os.path.abspath('pre.'),
+                         'Output file prefix changed on revalidation')
+        spec.output_file_prefix = 'post.'
+        spec.validate_values()
+        self.assertEqual(spec.output_file_prefix, os.path.abspath('post.'),
+                         'Changed output file prefix not made absolute')
+
+    def test_validate_values_cached_prefix(self):
+        in_list = [self.cwd + '/specificationTests.py']
+        tmpdir = tempfile.mkdtemp()
+        prefix = os.path.join(tmpdir, 'pre.')
+        spec = specification.Specifier(infiles=in_list, prefix=prefix)
+        spec.validate_values()
+        self.assertIn(tmpdir, specification._ISDIR_CACHE_,
+                      'Output directory not cached')
+        shutil.rmtree(tmpdir)
+        specification.Specifier.invalidate_cache()
+        self.assertNotIn(tmpdir, specification._ISDIR_CACHE_,
+                         'Output directory cache not cleared')
+        spec = specification.Specifier(infiles=in_list, prefix=prefix)
+        self.assertRaises(ValueError, spec.validate_values)
+
+    def test_validate_values_duplicate_input(self):
+        in_list = [self.cwd + '/specificationTests.py'] * 3
+        spec = specification.Specifier(infiles=in_list)
+        spec.validate_values()
+        self.assertEqual(spec.input_file_list, in_list,
+                         'Input file list changed by validation')
+
+    def test_validate_repeated(self):
+        fname = 'test_validate_repeated.nc'
+        open(fname, 'w').close()
+        spec = specification.Specifier(infiles=[fname])
+        spec.validate(io=True)
+        os.remove(fname)
+        spec.validate(io=True)
+        spec.validate()
+        spec.input_file_list.append(fname)
+        self.assertRaises(ValueError, spec.validate, io=True)
+
+    def test_validate_repeated_io(self):
+        spec = specification.Specifier(infiles=['a'])
+        spec.validate()
+        self.assertRaises(ValueError, spec.validate, io=True)
+
+    def test_validate_repeated_change(self):
+        spec = specification.Specifier(infiles=['a'])
+        spec.validate()
+        spec.netcdf_format = 'netcdf9'
+        self.assertRaises(ValueError, spec.validate)
+
     def test_validate_values_fail_backend(self):
         in_list = ['timekeeperTests.py', 'messengerTests.py']
         fmt = 'netcdf9'
@@ -338,6 +498,97 @@ class SpecifierTests(unittest.TestCase):
                              'Time variant metadata list not initialized properly')
         os.remove(fname)
 
+    def test_write_subclass(self):
+        fname = 'test_write_subclass.s2s'
+        spec = _SlottedSpecifier(infiles=['a'])
+        spec.slotted = 7
+        spec.write(fname)
+        spec2 = pickle.load(open(fname, 'r'))
+        os.remove(fname)
+        self.assertEqual(spec2.slotted, 7, 'Subclass slot not pickled')
+        spec = _DictSpecifier(infiles=['a'])
+        spec.extra = 42
+        for protocol in (0, 2):
+            spec2 = pickle.loads(pickle.dumps(spec, protocol))
+            self.assertEqual(spec2.extra, 42,
+                             'Subclass attribute not pickled')
+            self.assertEqual(spec2.input_file_list, ['a'],
+                             'Input file list not pickled')
+
+
+class _SlottedSpecifier(specification.Specifier):
+    __slots__ = 'slotted'
+
+
+class _DictSpecifier(specification.Specifier):
+    pass
+
+
+class _ListDirEntry(object):
+
+    """
+    Stand-in for a scandir DirEntry, built on os.listdir
+    """
+
+    def __init__(self, dir_name, name):
+        self.name = name
+        self.path = os.path.join(dir_name, name)
+
+    def is_file(self):
+        return os.path.isfile(self.path)
+
+
+def _listdir_scandir(dir_name):
+    return [_ListDirEntry(dir_name, name) for name in os.listdir(dir_name)]
+
+
+def _unlistable_scandir(dir_name):
+    raise OSError('Permission denied: {}'.format(dir_name))
+
+
+class ScandirSpecifierTests(SpecifierTests):
+
+    """
+    ScandirSpecifierTests Class
+
+    This class reruns the specification module tests with a scandir function
+    installed, so that the directory-scanning input file checks are used.
+    """
+
+    def setUp(self):
+        super(ScandirSpecifierTests, self).setUp()
+        self._scandir = specification._scandir_
+        specification._scandir_ = _listdir_scandir
+
+    def tearDown(self):
+        specification._scandir_ = self._scandir
+        super(ScandirSpecifierTests, self).tearDown()
+
+    def test_validate_values_unlistable_dir(self):
+        specification._scandir_ = _unlistable_scandir
+        in_list = [self.cwd + '/specificationTests.py']
+        spec = specification.Specifier(infiles=in_list)
+        spec.validate_values()
+        spec = specification.Specifier(infiles=in_list + ['missing.nc'])
+        self.assertRaises(ValueError, spec.validate_values)
+
+    def test_validate_values_checks_only_inputs(self):
+        checked = []
+
+        class _CheckedDirEntry(_ListDirEntry):
+
+            def is_file(self):
+                checked.append(self.name)
+                return super(_CheckedDirEntry, self).is_file()
+
+        specification._scandir_ = lambda dir_name: [
+            _CheckedDirEntry(dir_name, name) for name in os.listdir(dir_name)]
+        in_list = [self.cwd + '/specificationTests.py']
+        spec = specification.Specifier(infiles=in_list)
+        spec.validate_values()
+        self.assertListEqual(checked, ['specificationTests.py'],
+                             'Entries other than the inputs were checked')
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
@@ -255,7 +255,7 @@ class StatDB(object):
             spec = database.create_specifier(str(test_name), ncfmt='netcdf')
 
             # Validate the test information
-            spec.validate()
+            spec.validate(io=True)
 
             # Sort the input files by name
             spec.input_file_list.sort()